@@ -1,43 +1,84 @@
+import random
+import re
 from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import numpy as np
+
+# Struct-of-Arrays view of the market: one symbols array plus one float64 array per field,
+# all aligned by position so strategies can work column-wise instead of per-stock dicts.
+# float64 keeps prices, comparisons against user-entered bounds and sort ties identical to
+# the plain Python floats they replace.
+# symbol_to_idx maps each symbol to its position in the arrays. by_change and by_abs_change
+# are positions sorted by change and by absolute change (ties keep market order); they are
+# computed once per market so every top-k query is just a slice.
+MarketArrays = namedtuple('MarketArrays', ['symbols', 'symbol_to_idx', 'price', 'change', 'market_cap',
+                                           'volatility', 'by_change', 'by_abs_change'])
+
+def build_market_arrays(market_data):
+    def column(field, optional=False):
+        # price and change are required (a missing one raises KeyError); market_cap and
+        # volatility default to inf so a stock without them fails the custom criteria
+        values = (data.get(field, float('inf')) if optional else data[field] for data in market_data.values())
+        return np.fromiter(values, dtype=np.float64, count=len(market_data))
+
+    change = column('change')
+    return MarketArrays(
+        symbols=np.asarray(list(market_data)),
+        symbol_to_idx={stock: i for i, stock in enumerate(market_data)},
+        price=column('price'),
+        change=change,
+        market_cap=column('market_cap', optional=True),
+        volatility=column('volatility', optional=True),
+        by_change=np.argsort(change, kind='stable'),
+        by_abs_change=np.argsort(np.abs(change), kind='stable'),
+    )
+
+def align_prices(market, market_data):
+    # Price vector aligned with market.symbols; stocks missing from market_data are worth 0
+    return np.fromiter((market_data[stock]['price'] if stock in market_data else 0
+                        for stock in market.symbols.tolist()),
+                       dtype=np.float64, count=len(market.symbols))
 
 class Strategy(ABC):
     @abstractmethod
-    def select_stocks(self, market_data):
+    def select_stocks(self, market):
         """
         Selects stocks based on strategy-specific criteria.
-        :param market_data: A dictionary containing stock market data.
-        :return: A list of stock symbols to buy/sell.
+        :param market: A MarketArrays instance containing stock market data.
+        :return: Positions (into the market arrays) of the stocks to buy/sell.
         """
         pass
 
 class AggressiveStrategy(Strategy):
-    def select_stocks(self, market_data):
+    def select_stocks(self, market):
         # Example strategy: Buy stocks that dropped the most in the past day
-        sorted_stocks = sorted(market_data.items(), key = lambda x: x[1]['change'])
-        return [stock for stock, data in sorted_stocks[:10]]  # buy 10 stocks that dropped the most
+        return market.by_change[:10]  # buy 10 stocks that dropped the most
 
 class ConservativeStrategy(Strategy):
-    def select_stocks(self, market_data):
+    def select_stocks(self, market):
         # Example strategy: Buy stocks that are most stable (smallest changes)
-        sorted_stocks = sorted(market_data.items(), key = lambda x: abs(x[1]['change']))
-        return [stock for stock, data in sorted_stocks[:10]]  # buy 10 most stable stocks
+        return market.by_abs_change[:10]  # buy 10 most stable stocks
     
 class RandomStrategy(Strategy):
-    def select_stocks(self, market_data):
-        # Get all stock symbols from the market data
-        stock_list = list(market_data.keys())
-        # Shuffle the list of stocks to randomize the order
-        random.shuffle(stock_list)
-        # Return the first 10 stocks from the shuffled list
-        return stock_list[:10]
+    def select_stocks(self, market):
+        # Draw 10 distinct stocks at random without shuffling the whole market
+        num_stocks = len(market.symbols)
+        return random.sample(range(num_stocks), min(10, num_stocks))
 
 class CustomStrategy(Strategy):
     def __init__(self, stocks):
-        self.stocks = stocks  # Stocks should be a list of stock symbols
+        self.stocks = tuple(stocks)  # Stocks should be a sequence of stock symbols
+        # Picks from the last market seen, reused while the same market object is passed in
+        self._cached_market = None
+        self._cached_picks = None
 
-    def select_stocks(self, market_data):
+    def select_stocks(self, market):
         # Return the stocks that are both in the provided list and the market data
-        return [stock for stock in self.stocks if stock in market_data]
+        if market is not self._cached_market:
+            self._cached_picks = [market.symbol_to_idx[stock] for stock in self.stocks if stock in market.symbol_to_idx]
+            self._cached_market = market
+        return self._cached_picks
 
 class Investor:
     
@@ -45,20 +86,29 @@ class Investor:
         self.name = name
         self.strategy = strategy
         self.balance = balance
-        self.portfolio = {}
+        self.market = None
+        # Portfolio as parallel arrays: positions into the market arrays and shares held
+        self.idx = np.empty(0, np.int32)
+        self.shares = np.empty(0, np.int32)
 
-    def invest(self, market_data):
-        stocks_to_buy = self.strategy.select_stocks(market_data)
-        num_stocks = len(stocks_to_buy)
-        if num_stocks == 0:
-            print("No valid stocks to invest in.")
-            return
-        
-        amount_per_stock = self.balance / num_stocks
-        for stock in stocks_to_buy:
-            shares_to_buy = int(amount_per_stock / market_data[stock]['price'])
-            self.portfolio[stock] = shares_to_buy
-            self.balance -= shares_to_buy * market_data[stock]['price']
+    def invest(self, market):
+        run_investors([self], market)
+
+    def add_holdings(self, market, idx, shares):
+        # Same semantics as the old dict update: existing positions are kept, a repeated stock
+        # takes the new share count, and new stocks are appended in purchase order
+        holdings = dict(zip(self.idx.tolist(), self.shares.tolist()))
+        holdings.update(zip(idx.tolist(), shares.tolist()))
+        self.market = market
+        self.idx = np.fromiter(holdings.keys(), dtype=np.int32, count=len(holdings))
+        self.shares = np.fromiter(holdings.values(), dtype=np.int32, count=len(holdings))
+
+    @property
+    def portfolio(self):
+        # Symbol -> shares view of the holdings, rebuilt on demand for display
+        if self.market is None:
+            return {}
+        return dict(zip(self.market.symbols[self.idx].tolist(), self.shares.tolist()))
                 
     def display_portfolio(self):
         print(f"{self.name}'s Portfolio:\n{'-'*20}")
@@ -66,69 +116,68 @@ class Investor:
             print(f"{stock}: {quantity} shares")
         print(f"\nRemaining Balance: ${self.balance:.2f}\n")
         
-def create_custom_strategy(market_data):
-    print("Create your strategy based on:")
-    print("Enter minimum market cap (in millions):")
-    market_cap = float(input())  # Convert input directly to float
-    print("Enter maximum volatility percentage:")
-    volatility = float(input())  # Convert input directly to float
-
-    # Function to evaluate if a stock meets the custom criteria
-    def custom_criteria(stock_data, min_market_cap, max_market_cap, min_volatility, max_volatility):
-        meets_cap = min_market_cap <= stock_data.get('market_cap', float('inf')) <= max_market_cap
-        meets_volatility = min_volatility <= stock_data.get('volatility', float('inf')) <= max_volatility
-        return meets_cap and meets_volatility
-
-    # Filter the stocks based on the provided criteria
-    selected_stocks = [stock for stock, data in market_data.items() if custom_criteria(data)]
-    
-    # Debugging output to understand what's being selected
-    print("Selected stocks based on criteria:", selected_stocks)
-    
-    # Check if any stocks were selected
-    if not selected_stocks:
-        print("No valid stocks to invest in based on the criteria provided.")
-        return None  # Return None or raise an error as per your game design needs
+def run_investors(investors, market):
+    # Invest for several investors at once: their picks are padded into one (investors x stocks)
+    # matrix so prices are gathered, divided, cast and summed in a single pass
+    picks = [np.asarray(investor.strategy.select_stocks(market), dtype=np.int32) for investor in investors]
+    counts = np.array([len(idx) for idx in picks], dtype=np.int32)
+    # Holdings are positions into one market, so buying into another would mix up the symbols
+    for investor, count in zip(investors, counts):
+        if count and len(investor.idx) and investor.market is not market:
+            raise ValueError(f"{investor.name} already holds stocks from a different market.")
+    idx_matrix = np.zeros((len(investors), int(counts.max(initial=0))), dtype=np.int32)
+    for row, idx in enumerate(picks):
+        idx_matrix[row, :len(idx)] = idx
+    held = np.arange(idx_matrix.shape[1]) < counts[:, None]  # False on padding slots
 
-    return CustomStrategy(selected_stocks[:10])  # Limit to 10 stocks
+    prices = np.take(market.price, idx_matrix)
+    balances = np.array([investor.balance for investor in investors], dtype=np.float64)
+    amount_per_stock = balances / np.maximum(counts, 1)
+    shares = np.where(held, (amount_per_stock[:, None] / prices).astype(np.int32), 0)
+    spent = (shares * prices).sum(axis=1)
 
-def player_options_menu(market_data):
-    print("Choose your investment approach:")
-    print("1. Freely choose and input 10 stock symbols")
-    print("2. Choose a predefined strategy")
-    print("3. Create your own strategy based on criteria")
+    for row, investor in enumerate(investors):
+        if counts[row] == 0:
+            print("No valid stocks to invest in.")
+            continue
+        investor.add_holdings(market, picks[row], shares[row, :counts[row]])
+        investor.balance -= float(spent[row])
 
-    choice = input("Enter your choice (1, 2, or 3): ")
-    
-    if choice == '1':
-        player_stocks = get_player_stocks(market_data)
-        player_strategy = CustomStrategy(player_stocks)
-    elif choice == '2':
-        player_strategy = choose_predefined_strategy()
-    elif choice == '3':
-        player_strategy = create_custom_strategy(market_data)
-    else:
-        print("Invalid choice, please select 1, 2, or 3.")
-        return player_options_menu(market_data)
-    
-    return player_strategy
+def player_options_menu(market):
+    while True:
+        print("Choose your investment approach:")
+        print("1. Freely choose and input 10 stock symbols")
+        print("2. Choose a predefined strategy")
+        print("3. Create your own strategy based on criteria")
+
+        choice = input("Enter your choice (1, 2, or 3): ")
+        
+        if choice == '1':
+            player_stocks = get_player_stocks(market)
+            return CustomStrategy(player_stocks)
+        elif choice == '2':
+            return choose_predefined_strategy()
+        elif choice == '3':
+            return create_custom_strategy(market)
+        else:
+            print("Invalid choice, please select 1, 2, or 3.")
 
 def choose_predefined_strategy():
-    print("Available Strategies:")
-    print("1. Aggressive Strategy")
-    print("2. Conservative Strategy")
-    print("3. Random Strategy")
-    strategy_choice = input("Choose a strategy (1-3): ")
-    
-    if strategy_choice == '1':
-        return AggressiveStrategy()
-    elif strategy_choice == '2':
-        return ConservativeStrategy()
-    elif strategy_choice == '3':
-        return RandomStrategy()
-    else:
-        print("Invalid choice. Please select a valid strategy.")
-        return choose_predefined_strategy()
+    while True:
+        print("Available Strategies:")
+        print("1. Aggressive Strategy")
+        print("2. Conservative Strategy")
+        print("3. Random Strategy")
+        strategy_choice = input("Choose a strategy (1-3): ")
+        
+        if strategy_choice == '1':
+            return AggressiveStrategy()
+        elif strategy_choice == '2':
+            return ConservativeStrategy()
+        elif strategy_choice == '3':
+            return RandomStrategy()
+        else:
+            print("Invalid choice. Please select a valid strategy.")
 
 def get_float_input(prompt):
     while True:
@@ -137,11 +186,15 @@ def get_float_input(prompt):
         except ValueError:
             print("Invalid input, please enter a numeric value.")
             
+# Either a comma (with optional spaces around it) or a run of whitespace separates the two values.
+# The alternatives cannot split the same characters two ways, so splitting stays linear.
+SEPARATOR_RE = re.compile(r'\s*,\s*|\s+')
+
 def safe_float_input(prompt):
     while True:
         input_str = input(prompt)
         try:
-            values = list(map(float, input_str.split(',')))
+            values = [float(value) for value in SEPARATOR_RE.split(input_str.strip())]
             if len(values) == 2:
                 return values
             else:
@@ -149,15 +202,15 @@ def safe_float_input(prompt):
         except ValueError:
             print("Invalid input; please ensure you enter numeric values.")
             
-def create_custom_strategy(market_data):
+def create_custom_strategy(market):
     min_market_cap, max_market_cap = safe_float_input("Enter minimum and maximum market cap (in millions), separated by a comma (e.g., 0.1, 500):")
     min_volatility, max_volatility = safe_float_input("Enter minimum and maximum volatility percentage, separated by a comma (e.g., 10, 50):")
 
-    selected_stocks = [
-        stock for stock, data in market_data.items()
-        if min_market_cap <= data.get('market_cap', float('inf')) <= max_market_cap and
-        min_volatility <= data.get('volatility', float('inf')) <= max_volatility
-    ]
+    # Volatility has the wider spread, so filter on it first and only test market cap on the survivors
+    candidates = np.flatnonzero((market.volatility >= min_volatility) & (market.volatility <= max_volatility))
+    market_cap = market.market_cap[candidates]
+    selected = candidates[(market_cap >= min_market_cap) & (market_cap <= max_market_cap)]
+    selected_stocks = market.symbols[selected].tolist()
 
     print("Selected stocks based on criteria:", selected_stocks)
 
@@ -167,15 +220,17 @@ def create_custom_strategy(market_data):
 
     return CustomStrategy(selected_stocks[:10])  # Limit to 10 stocks
 
-def get_player_stocks(market_data):
+def get_player_stocks(market):
     print("Enter up to 10 stock symbols, separated by commas (e.g., AAPL, GOOGL, MSFT):")
     input_string = input("Enter stock symbols: ")
     stock_list = [stock.strip().upper() for stock in input_string.split(',')]
     player_stocks = []
+    seen = set()  # mirrors player_stocks for O(1) duplicate checks
     for stock in stock_list:
-        if stock in market_data:
-            if stock not in player_stocks and len(player_stocks) < 10:
+        if stock in market.symbol_to_idx:
+            if stock not in seen and len(player_stocks) < 10:
                 player_stocks.append(stock)
+                seen.add(stock)
             elif len(player_stocks) >= 10:
                 print("Maximum of 10 stocks reached. Additional stocks are ignored.")
                 break
@@ -183,23 +238,28 @@ def get_player_stocks(market_data):
             print(f"Invalid stock symbol {stock}. Please try again.")
     return player_stocks
 
-def calculate_portfolio_return(portfolio, initial_market_data, final_market_data):
-    initial_value = sum(initial_market_data[stock]['price'] * quantity for stock, quantity in portfolio.items())
-    final_value = sum(final_market_data[stock]['price'] * quantity for stock, quantity in portfolio.items() if stock in final_market_data)
-
+def portfolio_return_pct(idx, shares, initial_prices, final_prices):
+    # Numeric core of calculate_portfolio_return: arrays in, a float out (None if nothing was invested)
+    initial_value = float(np.dot(initial_prices[idx], shares))
     if initial_value == 0:
+        return None
+    final_value = float(np.dot(final_prices[idx], shares))
+    return ((final_value - initial_value) / initial_value) * 100
+
+def calculate_portfolio_return(investor, initial_prices, final_prices):
+    return_pct = portfolio_return_pct(investor.idx, investor.shares, initial_prices, final_prices)
+    if return_pct is None:
         print("Initial portfolio value is zero; no investments were made.")
         return 0  # Return 0 to indicate no growth or loss
-    return ((final_value - initial_value) / initial_value) * 100
+    return return_pct
 
-def compare_portfolios(investors, initial_market_data, final_market_data):
-    results = {}
-    for investor in investors:
-        return_pct = calculate_portfolio_return(investor.portfolio, initial_market_data, final_market_data)
-        results[investor.name] = return_pct
-        print(f"{investor.name}'s portfolio return: {return_pct:.2f}%")
-    best_performer = max(results, key=results.get)
-    print(f"The best performing portfolio is {best_performer} with a return of {results[best_performer]:.2f}%.")
+def compare_portfolios(investors, initial_prices, final_prices):
+    returns = np.empty(len(investors), dtype=np.float64)
+    for i, investor in enumerate(investors):
+        returns[i] = calculate_portfolio_return(investor, initial_prices, final_prices)
+        print(f"{investor.name}'s portfolio return: {returns[i]:.2f}%")
+    best = int(returns.argmax())
+    print(f"The best performing portfolio is {investors[best].name} with a return of {returns[best]:.2f}%.")
 
 market_data = {
     'AAPL': {'price': 150, 'change': -0.5, 'market_cap': 2200, 'volatility': 25},
@@ -247,8 +307,12 @@ market_data_next_year = {
     'PEP': {'price': 170}   # Increased
 }
 
+# Integer-indexed price vectors, built once so valuation never goes back to the dicts
+market = build_market_arrays(market_data)
+final_prices = align_prices(market, market_data_next_year)
+
 # Get the player's chosen strategy
-player_strategy = player_options_menu(market_data)
+player_strategy = player_options_menu(market)
 
 # Create a player with the chosen strategy
 player = Investor("Player", player_strategy)
@@ -258,9 +322,7 @@ investor1 = Investor("Alice", AggressiveStrategy())
 investor2 = Investor("Bob", ConservativeStrategy())
 
 # Simulate the investment decisions
-investor1.invest(market_data)
-investor2.invest(market_data)
-player.invest(market_data)
+run_investors([investor1, investor2, player], market)
 
 # Display portfolios
 player.display_portfolio()
@@ -268,4 +330,4 @@ investor1.display_portfolio()
 investor2.display_portfolio()
 
 # Assume time passes and now we evaluate the portfolios one year later
-compare_portfolios([investor1, investor2, player], market_data, market_data_next_year)
\ No newline at end of file
+compare_portfolios([investor1, investor2, player], market.price, final_prices)
\ No newline at end of file